@@ -4,150 +4,417 @@ Module for extracting metadata from DICOM files.
 Author: Kostas Moschonas
 Updated: 27-11-2025
 """
+import io
+import logging
+import mmap
 import os
 import zipfile
-import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 import re
-from typing import Dict, Optional
+import struct
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import pydicom
+from pydicom.tag import Tag
 import pandas as pd
 
+try:
+    # Optional: Arrow-backed string columns and a faster CSV writer
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+
+# No handlers are attached here: scripts choose where messages go (e.g. `logging.basicConfig(level=logging.INFO)`)
+log = logging.getLogger(__name__)
+
+# Pre-built tags, so reads and lookups skip the keyword -> tag resolution for every file
+_TAG_SERIES_DESCRIPTION = Tag(0x0008, 0x103E)
+_TAG_PATIENT_ID = Tag(0x0010, 0x0020)
+_TAG_STUDY_DATE = Tag(0x0008, 0x0020)
+_TAG_BIRTH_DATE = Tag(0x0010, 0x0030)
+_TAG_SEX = Tag(0x0010, 0x0040)
+_TAG_SERIES_TIME = Tag(0x0008, 0x0031)
+_TAG_HEIGHT = Tag(0x0010, 0x1020)
+_TAG_WEIGHT = Tag(0x0010, 0x1030)
+_TAG_DEVICE_SN = Tag(0x0018, 0x1000)
+_TAG_STUDY_UID = Tag(0x0020, 0x000D)
+
+# Header tags needed by the finder methods; everything else (including PixelData) is skipped while scanning
+FINDER_TAGS = [_TAG_SERIES_DESCRIPTION, _TAG_PATIENT_ID, _TAG_STUDY_DATE]
+# Zip members with these extensions are never DICOM and are skipped without being read
+NON_DICOM_EXTENSIONS = ('.txt', '.xml', '.json', '.csv', '.pdf', '.htm', '.html', '.jpg', '.png', '.db')
+# Archive names searched by the zip-folder finder (checked without lowercasing every file name)
+ZIP_SUFFIXES = ('.zip', '.ZIP', '.Zip')
+# Files lacking the 'DICM' preamble are still force-read when they carry one of these extensions
+DICOM_EXTENSIONS = ('.dcm', '.ima')
+# Output column -> source tag for each extracted field (column order of the metadata DataFrame)
+METADATA_FIELDS = (
+    ('patient_ID', _TAG_PATIENT_ID),
+    ('dob', _TAG_BIRTH_DATE),
+    ('sex', _TAG_SEX),
+    ('date', _TAG_STUDY_DATE),
+    ('time_series', _TAG_SERIES_TIME),
+    ('height', _TAG_HEIGHT),
+    ('weight', _TAG_WEIGHT),
+    ('scanner_id', _TAG_DEVICE_SN),
+    ('SeriesDescription', _TAG_SERIES_DESCRIPTION),
+    ('StudyInstanceUID', _TAG_STUDY_UID),
+)
+METADATA_COLUMNS = ['FilePath'] + [name for name, _ in METADATA_FIELDS]
+# First numeric token in a messy measurement string (e.g. '170 cm' -> '170')
+_NUM_RE = re.compile(r'([-+]?\d*\.?\d+)')
+# Dtype for the string columns of the metadata DataFrame
+STRING_DTYPE = "string[pyarrow]" if pa is not None else "string"
+
+# Constants for the header scanner (`_scan_header`)
+_TRANSFER_SYNTAX_TAG = 0x00020010
+_CHARSET_TAG = 0x00080005
+_PIXEL_DATA_TAG = 0x7FE00010
+_ITEM_TAG = 0xFFFEE000
+_ITEM_DELIMITER_TAG = 0xFFFEE00D
+_SEQUENCE_DELIMITER_TAG = 0xFFFEE0DD
+_UNDEFINED_LENGTH = 0xFFFFFFFF
+# Explicit VRs with a 2-byte reserved field and a 4-byte length
+_LONG_VRS = {b'OB', b'OD', b'OF', b'OL', b'OV', b'OW', b'SQ', b'SV', b'UC', b'UN', b'UR', b'UT', b'UV'}
+# Transfer syntaxes whose data set is *not* explicit VR little endian (implicit LE, deflated, big endian)
+_NON_EXPLICIT_LE_SYNTAXES = {'1.2.840.10008.1.2', '1.2.840.10008.1.2.1.99', '1.2.840.10008.1.2.2'}
+# Specific Character Set -> Python codec for text values
+_CHARSET_CODECS = {'': 'ascii', 'ISO_IR 6': 'ascii', 'ISO_IR 100': 'latin-1', 'ISO_IR 192': 'utf-8'}
+_unpack_tag = struct.Struct('<HH').unpack_from
+_unpack_u16 = struct.Struct('<H').unpack_from
+_unpack_u32 = struct.Struct('<I').unpack_from
+
+
+def _tag_value(dataset: pydicom.dataset.Dataset, tag: Tag, default='NA'):
+    """
+    Value of the element `tag` in `dataset`, or `default` when the element is absent.
+    (`Dataset.get` with a Tag key returns the element itself, not its value.)
+    """
+    element = dataset.get(tag)
+    return element.value if element is not None else default
+
+
+@contextmanager
+def _open_mmap(path: str) -> Iterator[Union[mmap.mmap, BinaryIO]]:
+    """
+    Open `path` as a read-only memory map, so header reads are served straight from the page cache.
+    Empty files (which cannot be mapped) are yielded as the plain file object.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield f
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield mm
+
+
+def _read_element_header(buf, offset: int) -> Tuple[int, Optional[bytes], int, int]:
+    """
+    Decode the explicit VR little endian element header at `offset`.
+    Returns `(tag, vr, length, value_offset)`; item/delimiter tags (group FFFE) have no VR.
+    Raises ValueError when the VR is not two uppercase letters (e.g. implicit VR data mislabeled as explicit).
+    """
+    group, element = _unpack_tag(buf, offset)
+    tag = (group << 16) | element
+    if group == 0xFFFE:
+        return tag, None, _unpack_u32(buf, offset + 4)[0], offset + 8
+    vr = buf[offset + 4:offset + 6]
+    if len(vr) != 2 or not (0x41 <= vr[0] <= 0x5A and 0x41 <= vr[1] <= 0x5A):
+        raise ValueError(f"invalid VR {vr!r} at offset {offset}")
+    if vr in _LONG_VRS:
+        return tag, vr, _unpack_u32(buf, offset + 8)[0], offset + 12
+    return tag, vr, _unpack_u16(buf, offset + 6)[0], offset + 8
+
+
+def _skip_value(buf, vr: Optional[bytes], length: int, offset: int) -> int:
+    """
+    Return the offset just past a value starting at `offset`, walking undefined-length sequences.
+    """
+    if length != _UNDEFINED_LENGTH:
+        return offset + length
+    if vr != b'SQ':
+        # e.g. UN with undefined length (implicit VR content); leave these files to pydicom
+        raise ValueError(f"cannot skip undefined-length {vr!r} element")
+    while True:
+        tag, _, item_length, offset = _read_element_header(buf, offset)
+        if tag == _SEQUENCE_DELIMITER_TAG:
+            return offset
+        if tag != _ITEM_TAG:
+            raise ValueError(f"unexpected tag {tag:08X} in sequence")
+        if item_length != _UNDEFINED_LENGTH:
+            offset += item_length
+            continue
+        while True:
+            tag, item_vr, length, offset = _read_element_header(buf, offset)
+            if tag == _ITEM_DELIMITER_TAG:
+                break
+            offset = _skip_value(buf, item_vr, length, offset)
+
+
+def _scan_header(path: str, wanted_tags) -> Optional[Dict[int, str]]:
+    """
+    Minimal header scanner: collect the text values of `wanted_tags` from a DICOM file with the 'DICM'
+    preamble whose data set is explicit VR little endian, without building a pydicom dataset.
+    Elements are stored in ascending tag order, so scanning stops at the largest wanted tag (or PixelData).
+    Returns a dict of tag -> value for the tags present, or None when the file must be read with pydicom
+    (other transfer syntaxes or character sets, malformed/truncated headers, implicit VR data sets
+    whose meta header claims explicit VR).
+    """
+    wanted = set(wanted_tags)
+    last_wanted = max(wanted)
+    found = {}
+    codec = 'ascii'
+    try:
+        with _open_mmap(path) as buf:
+            if not isinstance(buf, mmap.mmap) or buf[128:132] != b'DICM':
+                return None
+            # File meta information (group 0002) is always explicit VR little endian
+            offset = 132
+            transfer_syntax = None
+            while _unpack_tag(buf, offset)[0] == 0x0002:
+                tag, vr, length, offset = _read_element_header(buf, offset)
+                if tag == _TRANSFER_SYNTAX_TAG:
+                    transfer_syntax = buf[offset:offset + length].decode('ascii').strip(' \x00')
+                offset = _skip_value(buf, vr, length, offset)
+            if transfer_syntax is None or transfer_syntax in _NON_EXPLICIT_LE_SYNTAXES:
+                return None
+
+            while offset < len(buf):
+                tag, vr, length, offset = _read_element_header(buf, offset)
+                if tag > last_wanted or tag >= _PIXEL_DATA_TAG:
+                    break
+                if tag == _CHARSET_TAG:
+                    charset = buf[offset:offset + length].decode('ascii').strip(' \x00')
+                    if charset not in _CHARSET_CODECS:
+                        return None
+                    codec = _CHARSET_CODECS[charset]
+                elif tag in wanted:
+                    found[tag] = buf[offset:offset + length].decode(codec).strip(' \x00')
+                offset = _skip_value(buf, vr, length, offset)
+    except (OSError, ValueError, struct.error):
+        return None
+    return found
+
+
+def _iter_files(root: str, suffixes: Optional[Tuple[str, ...]] = None) -> Iterator[str]:
+    """
+    Recursively yield the paths of regular files under `root` using `os.scandir`
+    (cached `DirEntry` type info, no per-file join). Unreadable directories are skipped, like `os.walk`.
+    If `suffixes` is given, only files whose name ends with one of them are yielded (case-sensitive).
+    """
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_files(entry.path, suffixes)
+                elif (suffixes is None or entry.name.endswith(suffixes)) and entry.is_file():
+                    yield entry.path
+    except OSError:
+        return
+
+
+def _is_probably_dicom(path: str) -> bool:
+    """
+    Cheap check for the 'DICM' magic bytes at offset 128 (132-byte read, no parsing).
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(128)
+            return f.read(4) == b'DICM'
+    except OSError:
+        return False
+
+
+def _has_dicom_extension(path: str) -> bool:
+    """
+    True for `.dcm`/`.ima` files and files without a real extension
+    (including UID-style names such as `MR.1.3.12.2...`, whose "extension" is all digits).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    return ext in DICOM_EXTENSIONS or ext == '' or ext[1:].isdigit()
+
 
 class MetadataExtraction:
     """
     Extract metadata from DICOM files found in folders or zip archives.
 
-    Progress print statements are added to each step so the user can follow execution.
+    Progress is logged at each step so the user can follow execution;
+    per-file messages (checked/skipped/extracting) are logged at INFO when `verbose=True`, at DEBUG otherwise.
     """
 
-    def __init__(self, dicom_files: Optional[Dict[str, pydicom.dataset.FileDataset]] = None,
-                 root_directory: Optional[str] = None):
-        # Provided mapping of file path -> pydicom dataset or None to be filled by finder methods
+    def __init__(self, dicom_files: Optional[Union[Dict[str, pydicom.dataset.FileDataset],
+                                                   List[Tuple[str, pydicom.dataset.FileDataset]]]] = None,
+                 root_directory: Optional[str] = None, verbose: bool = False):
+        # Provided mapping (or list of pairs) of file path -> pydicom dataset or None to be filled by finder methods
         self.dicom_files = dicom_files
         # Optional root directory (not used directly in current methods but kept for API compatibility)
         self.root_directory = root_directory
         # Will hold the final pandas DataFrame after extraction
         self.metadata: Optional[pd.DataFrame] = None
+        # Log a line for every file inspected (slow on large trees)
+        self.verbose = verbose
+        # Per-file messages are logged at INFO for this instance when verbose, otherwise at DEBUG
+        # (the shared module logger's level is left to the caller)
+        self._file_log_level = logging.INFO if verbose else logging.DEBUG
 
     def find_dicom_by_series_description(self, folder_path: str, search_string: str):
         """
-        Walk `folder_path` and return the first DICOM dataset whose SeriesDescription contains `search_string`.
+        Scan `folder_path` and return the first DICOM dataset whose SeriesDescription contains `search_string`.
 
-        Prints progress for each file inspected and when a match is found.
+        Logs progress when a match is found (and for each file inspected when `verbose`).
         """
-        print(f"Searching folder `{folder_path}` for SeriesDescription containing: `{search_string}`")
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                dicom_path = os.path.join(root, file)
-                try:
-                    # Attempt to read as DICOM; `force=False` lets pydicom validate file structure
-                    dicom_file = pydicom.dcmread(dicom_path, force=False)
-                    series_description = str(dicom_file.get('SeriesDescription', 'NA'))
-                    # Inform about the file checked (kept concise)
-                    print(f"  checked: {dicom_path} -> SeriesDescription: {series_description}")
-                    if search_string.lower() in series_description.lower():
-                        print(f"  FOUND match: {dicom_path}")
-                        return dicom_file
-                except pydicom.errors.InvalidDicomError:
-                    # File is not a valid DICOM; skip and show a short message
-                    print(f"  skipped (not a DICOM): {dicom_path}")
-                    continue
-        print(f"No matching DICOM found in `{folder_path}`.")
+        log.info("Searching folder `%s` for SeriesDescription containing: `%s`", folder_path, search_string)
+        # Hoist loop invariants and attribute lookups out of the per-file loop
+        needle = search_string.lower()
+        _read_header = _read_finder_header
+        file_log_level = self._file_log_level
+        for dicom_path in _iter_files(folder_path):
+            # Read only the finder tags; non-DICOM files are skipped (and logged) by the reader
+            header, force = _read_header(dicom_path, file_log_level)
+            if header is None:
+                continue
+            series_description = str(header.get(_TAG_SERIES_DESCRIPTION, 'NA'))
+            # Inform about the file checked (kept concise)
+            log.log(file_log_level, "  checked: %s -> SeriesDescription: %s", dicom_path, series_description)
+            if needle in series_description.lower():
+                log.info("  FOUND match: %s", dicom_path)
+                # Re-read the full header of the selected file for metadata extraction
+                return pydicom.dcmread(dicom_path, force=force, stop_before_pixels=True)
+        log.info("No matching DICOM found in `%s`.", folder_path)
         return None
 
-    def find_dicom_in_zip_by_series_description(self, zip_path: str, search_string: str):
+    def find_dicom_in_zip_by_series_description(self, zip_path: str, search_string: str,
+                                                max_workers: Optional[int] = None):
         """
-        Extract a zip to a temporary directory and search inside for the requested SeriesDescription.
+        Stream members of a zip archive and return a DICOM dataset whose SeriesDescription
+        contains `search_string`. Members are read in memory; nothing is extracted to disk.
+        With `max_workers` > 1 the members are split into batches searched in a process pool
+        (the match returned is then the first one found, not necessarily the first in the archive).
         """
-        print(f"Searching zip file `{zip_path}` for SeriesDescription containing: `{search_string}`")
-        with tempfile.TemporaryDirectory() as temp_dir:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-            # Delegate to folder search and return first matching dataset
-            result = self.find_dicom_by_series_description(temp_dir, search_string)
-            if result is not None:
-                print(f"  match found inside zip `{zip_path}`")
-            else:
-                print(f"  no match inside zip `{zip_path}`")
-            return result
-
-    def find_dicom_in_zip_folder_by_series_description(self, zip_folder_path: str, search_string: str):
+        log.info("Searching zip file `%s` for SeriesDescription containing: `%s`", zip_path, search_string)
+        member_name = _find_zip_member(zip_path, search_string.lower(), max_workers, self._file_log_level)
+        if member_name is None:
+            log.info("  no match inside zip `%s`", zip_path)
+            return None
+        log.info("  match found inside zip `%s`: %s", zip_path, member_name)
+        # Re-read the full header of the matching member for metadata extraction
+        return _read_zip_member(zip_path, member_name)
+
+    def find_dicom_in_zip_folder_by_series_description(self, zip_folder_path: str, search_string: str,
+                                                       max_workers: Optional[int] = None):
         """
-        Walk `zip_folder_path` looking for .zip files and search each zip for a matching SeriesDescription.
+        Scan `zip_folder_path` for .zip files and search each zip for a matching SeriesDescription.
+        Zips are searched one after another; with `max_workers` > 1 they are searched concurrently in a
+        process pool instead (on Windows, call this from under an `if __name__ == '__main__':` guard).
         Returns a dict mapping `zip_path` -> matching pydicom dataset (for zips that contain a match).
         """
-        print(f"Searching folder `{zip_folder_path}` for zip files to inspect...")
+        log.info("Searching folder `%s` for zip files to inspect...", zip_folder_path)
+        zip_paths = list(_iter_files(zip_folder_path, ZIP_SUFFIXES))
+        log.info(" Inspecting %d zip files...", len(zip_paths))
+
         dicom_files = {}
-        for root, _, files in os.walk(zip_folder_path):
-            for file in files:
-                if file.lower().endswith(".zip"):
-                    zip_path = os.path.join(root, file)
-                    print(f" Inspecting zip: {zip_path}")
-                    dicom_file = self.find_dicom_in_zip_by_series_description(zip_path, search_string)
-                    if dicom_file is not None:
-                        dicom_files[zip_path] = dicom_file
-                        print(f"  recorded match from `{zip_path}`")
+        for zip_path, member_name in self._search_zips(zip_paths, search_string, max_workers):
+            if member_name is not None:
+                # The search yields only member names (datasets read from a zip hold an unpicklable file
+                # reference, so pool workers cannot return them); the matching header is read here
+                dicom_files[zip_path] = _read_zip_member(zip_path, member_name)
+                log.info("  recorded match from `%s`: %s", zip_path, member_name)
         if not dicom_files:
-            print(f"No matches found in any zip file under `{zip_folder_path}`.")
+            log.info("No matches found in any zip file under `%s`.", zip_folder_path)
         return dicom_files
 
-    def find_dicom_in_folder_by_series_description(self, folder_path: str, filter_function=None):
+    def _search_zips(self, zip_paths: List[str], search_string: str,
+                     max_workers: Optional[int]) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Yield `(zip_path, matching member name or None)` for each zip, serially or (with `max_workers` > 1)
+        from a process pool in completion order.
+        """
+        if not (max_workers and max_workers > 1 and len(zip_paths) > 1):
+            for zip_path in zip_paths:
+                yield zip_path, _find_dicom_in_zip(zip_path, search_string, self.verbose)
+            return
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_find_dicom_in_zip, zip_path, search_string, self.verbose): zip_path
+                       for zip_path in zip_paths}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def find_dicom_in_folder_by_series_description(self, folder_path: str, filter_function=None,
+                                                   max_workers: int = 32):
         """
         Find one representative DICOM dataset per (PatientID, StudyDate) pair in `folder_path`.
         Uses `filter_function(series_description)` to decide whether a file qualifies.
+        Headers are read concurrently in a thread pool of `max_workers` threads
+        (about 8 suits local SSDs, 64+ suits network storage).
         Returns a dict mapping file_path -> pydicom dataset.
         """
-        print(f"Scanning folder `{folder_path}` for DICOM files matching filter...")
-        dicom_files = {}
-        processed_study_keys = set()
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    dicom_file = pydicom.dcmread(file_path, force=False)
-                except pydicom.errors.InvalidDicomError:
-                    print(f"  skipped (not DICOM): {file_path}")
-                    continue
+        return self.find_dicom_in_folder_by_series_filters(
+            folder_path, {None: filter_function}, max_workers=max_workers
+        )[None]
 
-                series_description = str(dicom_file.get('SeriesDescription', 'NA'))
-                if filter_function and not filter_function(series_description):
-                    # Skip files that don't match the provided filter
+    def find_dicom_in_folder_by_series_filters(self, folder_path: str,
+                                               filters: Dict[Optional[str], Optional[Callable[[str], bool]]],
+                                               max_workers: int = 32):
+        """
+        Like `find_dicom_in_folder_by_series_description`, but applies several filters in a single pass
+        over `folder_path`, reading each header once.
+        `filters` maps a label to a `filter_function(series_description)` (None accepts every file);
+        each label keeps its own one-file-per-(PatientID, StudyDate) selection.
+        Returns a dict mapping label -> {file_path: pydicom dataset}.
+        """
+        log.info("Scanning folder `%s` for DICOM files matching filter...", folder_path)
+        results = {label: {} for label in filters}
+        processed_study_keys = {label: set() for label in filters}
+        full_headers = {}
+        file_log_level = self._file_log_level
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Reads overlap in the pool (and start while the folder is still being walked, as `map` submits
+            # each path as it is yielded); grouping and filtering stay on this thread, so no locking is needed
+            headers = executor.map(lambda path: (path, _read_finder_header(path, file_log_level)),
+                                   _iter_files(folder_path))
+            for file_path, (header, force) in headers:
+                if header is None:
                     continue
 
-                patient_id = dicom_file.get('PatientID', 'NA')
-                study_date = dicom_file.get('StudyDate', 'NA')
+                patient_id = header.get(_TAG_PATIENT_ID, 'NA')
+                study_date = header.get(_TAG_STUDY_DATE, 'NA')
                 study_key = (patient_id, study_date)
-                # Keep one file per patient/study combination
-                if study_key not in processed_study_keys:
-                    dicom_files[file_path] = dicom_file
-                    processed_study_keys.add(study_key)
-                    print(f"  recorded: {file_path} (PatientID={patient_id}, StudyDate={study_date})")
-        if not dicom_files:
-            print(f"No DICOM files matching the filter found in `{folder_path}`.")
-        return dicom_files
+                series_description = str(header.get(_TAG_SERIES_DESCRIPTION, 'NA'))
+                for label, filter_function in filters.items():
+                    # Keep one file per patient/study combination: once a study is recorded for a label,
+                    # its remaining files are skipped before the filter is evaluated
+                    if study_key in processed_study_keys[label]:
+                        continue
+                    if filter_function and not filter_function(series_description):
+                        # Skip files that don't match the provided filter
+                        continue
+
+                    if file_path not in full_headers:
+                        full_headers[file_path] = pydicom.dcmread(file_path, force=force, stop_before_pixels=True)
+                    results[label][file_path] = full_headers[file_path]
+                    processed_study_keys[label].add(study_key)
+                    log.info("  recorded%s: %s (PatientID=%s, StudyDate=%s)",
+                             f" [{label}]" if label is not None else "", file_path, patient_id, study_date)
+        for label, dicom_files in results.items():
+            if not dicom_files:
+                log.info("No DICOM files matching the %sfilter found in `%s`.",
+                         f"`{label}` " if label is not None else "", folder_path)
+        return results
 
-    def _normalize_numeric(self, value):
+    def _normalize_numeric_column(self, series: pd.Series) -> pd.Series:
         """
-        Convert a possibly messy numeric value (e.g., '170 cm', '70.5') to a numeric type or pd.NA.
+        Convert a column of possibly messy numeric values (e.g., '170 cm', '70.5') to floats,
+        using the first numeric token of values that are not plain numbers; unparseable values become NaN.
         """
-        if value is None:
-            return pd.NA
-        # Try direct numeric conversion first
-        try:
-            return pd.to_numeric(value)
-        except Exception:
-            pass
-        # Otherwise extract the first numeric token from a string
-        s = str(value).strip()
-        m = re.search(r'[-+]?\d*\.?\d+', s)
-        if m:
-            try:
-                # Keep as float for measurements
-                return float(m.group(0))
-            except Exception:
-                return pd.NA
-        return pd.NA
+        s = series.astype(str).str.strip()
+        numeric = pd.to_numeric(s, errors='coerce')
+        # Fall back to the first numeric token for values that are not plain numbers
+        fallback = pd.to_numeric(s.str.extract(_NUM_RE, expand=False), errors='coerce')
+        return numeric.fillna(fallback)
 
     def _extract_metadata_from_dicom(self, dicom_file: pydicom.dataset.FileDataset) -> Dict:
         """
@@ -155,100 +422,76 @@ class MetadataExtraction:
         Strictly uses `PatientID` for the `patient_ID` field (no fallback).
         """
         # Compose a simple dict of raw values (conversion/parsing happens later)
-        return {
-            'patient_ID': dicom_file.get('PatientID', 'NA'),
-            'dob': dicom_file.get('PatientBirthDate', 'NA'),
-            'sex': dicom_file.get('PatientSex', 'NA'),
-            'date': dicom_file.get('StudyDate', 'NA'),
-            'time_series': dicom_file.get('SeriesTime', 'NA'),
-            'height': dicom_file.get('PatientSize', 'NA'),
-            'weight': dicom_file.get('PatientWeight', 'NA'),
-            'scanner_id': dicom_file.get('DeviceSerialNumber', 'NA'),
-            'SeriesDescription': dicom_file.get('SeriesDescription', 'NA'),
-            'StudyInstanceUID': dicom_file.get('StudyInstanceUID', 'NA'),
-        }
+        return {name: _tag_value(dicom_file, tag) for name, tag in METADATA_FIELDS}
 
     def extract_metadata(self) -> pd.DataFrame:
         """
-        Iterate over `self.dicom_files` (a dict of file_path -> pydicom dataset),
+        Iterate over `self.dicom_files` (a dict of file_path -> pydicom dataset, or a list of
+        `(file_path, dataset)` pairs when the same file must appear in several rows),
         extract metadata for each file, convert column formats, and return a DataFrame.
-        Prints progress as files are processed.
+        Logs progress as files are processed.
         """
         source = self.dicom_files or {}
-        total = len(source)
-        print(f"Beginning metadata extraction for {total} files.")
+        items = list(source.items()) if isinstance(source, dict) else list(source)
+        total = len(items)
+        log.info("Beginning metadata extraction for %d files.", total)
 
-        file_paths, patient_ids, dob_list, sex_list, date_list, time_series_list = [], [], [], [], [], []
-        height_list, weight_list, scanner_id_list, series_description_list, study_uid_list = [], [], [], [], []
+        records = []
 
-        for idx, (file_path, dicom_file) in enumerate(source.items(), start=1):
-            print(f"[{idx}/{total}] Extracting metadata from: {file_path}")
+        for idx, (file_path, dicom_file) in enumerate(items, start=1):
+            log.log(self._file_log_level, "[%d/%d] Extracting metadata from: %s", idx, total, file_path)
             meta = self._extract_metadata_from_dicom(dicom_file)
 
             # Warn if PatientID is missing (since strict behavior was requested)
             if meta['patient_ID'] in (None, 'NA', ''):
-                print(f"  WARNING: missing PatientID for file `{file_path}` -> recorded as 'NA'")
-
-            file_paths.append(file_path)
-            patient_ids.append(meta['patient_ID'])
-            dob_list.append(meta['dob'])
-            sex_list.append(meta['sex'])
-            date_list.append(meta['date'])
-            time_series_list.append(meta['time_series'])
-            height_list.append(meta['height'])
-            weight_list.append(meta['weight'])
-            scanner_id_list.append(meta['scanner_id'])
-            series_description_list.append(meta['SeriesDescription'])
-            study_uid_list.append(meta['StudyInstanceUID'])
-
-        # Build DataFrame from collected lists
-        df = pd.DataFrame({
-            'FilePath': file_paths,
-            'patient_ID': patient_ids,
-            'dob': dob_list,
-            'sex': sex_list,
-            'date': date_list,
-            'time_series': time_series_list,
-            'height': height_list,
-            'weight': weight_list,
-            'scanner_id': scanner_id_list,
-            'SeriesDescription': series_description_list,
-            'StudyInstanceUID': study_uid_list,
-        })
-
-        print("Converting column formats (strings, dates, numerics)...")
+                log.warning("  missing PatientID for file `%s` -> recorded as 'NA'", file_path)
+
+            records.append({'FilePath': file_path, **meta})
+
+        # Build DataFrame from the collected records in a single pass
+        df = pd.DataFrame.from_records(records, columns=METADATA_COLUMNS)
+
+        log.info("Converting column formats (strings, dates, numerics)...")
         self.metadata = self._convert_column_formats(df)
-        print("Metadata extraction complete.")
+        log.info("Metadata extraction complete.")
         return self.metadata
 
     def _convert_column_formats(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Normalize data types:
-        - Coerce key string columns to string and normalize 'None'/'nan' to 'NA'
+        - Coerce key string columns to pandas strings (Arrow-backed when pyarrow is installed)
+          and normalize missing/'None'/'nan' values to 'NA'
         - Parse DICOM date fields (YYYYMMDD) into pandas timestamps
         - Convert height and weight to numeric where possible
         """
         # Columns expected to be strings
         str_cols = ['FilePath', 'patient_ID', 'scanner_id', 'SeriesDescription', 'sex', 'StudyInstanceUID', 'time_series']
+        df[str_cols] = df[str_cols].astype(STRING_DTYPE)
         for col in str_cols:
-            # Convert and replace common null representations
-            df[col] = df[col].astype(str).replace({'None': 'NA', 'nan': 'NA'})
+            # Replace common null representations
+            df[col] = df[col].fillna('NA').mask(df[col].isin(['None', 'nan']), 'NA')
 
-        # Parse DICOM-style dates (format YYYYMMDD); invalid parse -> NaT
-        for col in ['dob', 'date']:
-            print(f"  parsing date column: {col}")
-            df[col] = pd.to_datetime(df[col], format='%Y%m%d', errors='coerce')
+        # Parse DICOM-style dates (format YYYYMMDD); invalid parse -> NaT.
+        # Each distinct date string is parsed once for both columns and mapped back onto the rows.
+        date_cols = ['dob', 'date']
+        log.info("  parsing date columns: %s", ', '.join(date_cols))
+        date_strings = {col: df[col].astype(str) for col in date_cols}
+        unique_dates = pd.unique(pd.concat(list(date_strings.values()), ignore_index=True))
+        parsed_dates = pd.Series(pd.to_datetime(unique_dates, format='%Y%m%d', exact=True, errors='coerce'),
+                                 index=unique_dates)
+        for col in date_cols:
+            df[col] = date_strings[col].map(parsed_dates)
 
         # Normalize numeric measurements and report counts of successful conversions
-        print("  normalizing numeric measurements: height, weight")
-        df['height'] = df['height'].apply(self._normalize_numeric)
-        df['weight'] = df['weight'].apply(self._normalize_numeric)
+        log.info("  normalizing numeric measurements: height, weight")
+        df['height'] = self._normalize_numeric_column(df['height'])
+        df['weight'] = self._normalize_numeric_column(df['weight'])
 
         # Show brief summary counts (non-null) to track conversions
         try:
             non_null_height = df['height'].notna().sum()
             non_null_weight = df['weight'].notna().sum()
-            print(f"  height non-null count: {non_null_height}, weight non-null count: {non_null_weight}")
+            log.info("  height non-null count: %d, weight non-null count: %d", non_null_height, non_null_weight)
         except Exception:
             # Be silent if something unexpected happens here
             pass
@@ -258,10 +501,162 @@ class MetadataExtraction:
     def save_metadata_to_csv(self, filename: str = "metadata_cmr_dicom.csv"):
         """
         Save the last extracted metadata DataFrame to CSV.
+        Uses the pyarrow CSV writer when pyarrow is installed, otherwise pandas' `to_csv`.
         """
         if self.metadata is None:
-            print("No metadata available. Run `extract_metadata()` first.")
+            log.warning("No metadata available. Run `extract_metadata()` first.")
             return
-        print(f"Saving metadata to CSV: `{filename}`")
-        self.metadata.to_csv(filename, index=False)
-        print(f"CSV saved: `{filename}`")
\ No newline at end of file
+        log.info("Saving metadata to CSV: `%s`", filename)
+        write_metadata_csv(self.metadata, filename)
+        log.info("CSV saved: `%s`", filename)
+
+
+def _read_finder_header(file_path: str, log_level: int = logging.DEBUG) -> Tuple[Optional[Dict[int, object]], bool]:
+    """
+    Read only the finder tags of `file_path` (also used as the thread-pool worker of the folder finder).
+    Files in explicit VR little endian go through `_scan_header`; others are read by pydicom.
+    Returns `(header, force)`, where `header` maps each finder tag found to its value and `force` is the
+    `dcmread` flag to reuse when re-reading the file, or `(None, False)` for files that are not DICOM.
+    """
+    # Files with the DICM preamble are validated by pydicom (`force=False`); preamble-less files
+    # are only force-read when their extension suggests DICOM, everything else is skipped unread
+    if _is_probably_dicom(file_path):
+        header = _scan_header(file_path, FINDER_TAGS)
+        if header is not None:
+            return header, False
+        force = False
+    elif _has_dicom_extension(file_path):
+        force = True
+    else:
+        log.log(log_level, "  skipped (not DICOM): %s", file_path)
+        return None, False
+    try:
+        # pydicom walks the same elements whichever tags are requested, so one read serves every check.
+        # A plain file object is used here: pydicom seeking past the end of a memory map raises ValueError
+        dicom_file = pydicom.dcmread(file_path, force=force, stop_before_pixels=True, specific_tags=FINDER_TAGS)
+    except (pydicom.errors.InvalidDicomError, ValueError, EOFError):
+        log.log(log_level, "  skipped (not DICOM): %s", file_path)
+        return None, False
+    except Exception:
+        # Force-read junk (README, VERSION, lock files, ...) can fail in arbitrary ways (struct.error,
+        # NotImplementedError, BytesLengthException, ...); skip it rather than abort the whole scan
+        if not force:
+            raise
+        log.log(log_level, "  skipped (not DICOM): %s", file_path)
+        return None, False
+    header = {tag: _tag_value(dicom_file, tag) for tag in FINDER_TAGS}
+    # A forced read "succeeds" on empty files and other junk, returning a dataset with none of the finder tags
+    if force and all(tag not in dicom_file for tag in FINDER_TAGS):
+        log.log(log_level, "  skipped (not DICOM): %s", file_path)
+        return None, False
+    return header, force
+
+
+def write_metadata_csv(df: pd.DataFrame, filename: str):
+    """
+    Write a metadata DataFrame to CSV without its index.
+    Uses the (multi-threaded, C++) pyarrow CSV writer when pyarrow is installed, otherwise pandas' `to_csv`.
+    """
+    if pa is None:
+        df.to_csv(filename, index=False)
+        return
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Write DICOM dates as YYYY-MM-DD (as pandas does) rather than full timestamps
+    for col in ('dob', 'date'):
+        idx = table.schema.get_field_index(col)
+        if idx != -1 and pa.types.is_timestamp(table.schema.field(idx).type):
+            table = table.set_column(idx, col, table.column(col).cast(pa.date32()))
+    pacsv.write_csv(table, filename, write_options=pacsv.WriteOptions(include_header=True))
+
+
+def _is_dicom_member_candidate(info: zipfile.ZipInfo) -> bool:
+    """
+    Cheap filter on zip member metadata: regular members over 1 KB without a known non-DICOM extension.
+    """
+    return (not info.is_dir() and info.file_size > 1024
+            and not info.filename.lower().endswith(NON_DICOM_EXTENSIONS))
+
+
+def _zip_member_matches(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, needle: str, zip_path: str,
+                        log_level: int = logging.DEBUG) -> bool:
+    """
+    Read only the SeriesDescription of one zip member and check it for the lowercased `needle`.
+    """
+    member_path = f"{zip_path}/{info.filename}"
+    try:
+        with zip_ref.open(info) as fh:
+            dicom_file = pydicom.dcmread(fh, force=False, stop_before_pixels=True,
+                                         specific_tags=[_TAG_SERIES_DESCRIPTION])
+    except pydicom.errors.InvalidDicomError:
+        log.log(log_level, "  skipped (not a DICOM): %s", member_path)
+        return False
+    series_description = str(_tag_value(dicom_file, _TAG_SERIES_DESCRIPTION))
+    log.log(log_level, "  checked: %s -> SeriesDescription: %s", member_path, series_description)
+    return needle in series_description.lower()
+
+
+def _search_zip_member_batch(zip_path: str, member_names: List[str], needle: str,
+                             log_level: int = logging.DEBUG) -> Optional[str]:
+    """
+    Process-pool worker: open `zip_path` and return the name of the first member in `member_names`
+    whose SeriesDescription contains `needle`, or None.
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for name in member_names:
+            if _zip_member_matches(zip_ref, zip_ref.getinfo(name), needle, zip_path, log_level):
+                return name
+    return None
+
+
+def _search_zip_members_in_pool(zip_path: str, member_names: List[str], needle: str,
+                                max_workers: int, log_level: int = logging.DEBUG) -> Optional[str]:
+    """
+    Search the members of one zip in a process pool, a few batches per worker so each worker opens the
+    archive only a handful of times. Pending batches are cancelled once a match is found.
+    """
+    batch_size = max(1, -(-len(member_names) // (max_workers * 4)))
+    batches = [member_names[i:i + batch_size] for i in range(0, len(member_names), batch_size)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_search_zip_member_batch, zip_path, batch, needle, log_level)
+                   for batch in batches]
+        for future in as_completed(futures):
+            match = future.result()
+            if match is not None:
+                for pending in futures:
+                    pending.cancel()
+                return match
+    return None
+
+
+def _find_zip_member(zip_path: str, needle: str, max_workers: Optional[int] = None,
+                     log_level: int = logging.DEBUG) -> Optional[str]:
+    """
+    Return the name of a member of `zip_path` whose SeriesDescription contains the lowercased `needle`, or None.
+    With `max_workers` > 1 the members are searched in a process pool (see `_search_zip_members_in_pool`).
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        # Skip directories, tiny members and members that are clearly not DICOM (reports, text files, etc.)
+        candidates = [info for info in zip_ref.infolist() if _is_dicom_member_candidate(info)]
+        if max_workers and max_workers > 1 and len(candidates) > 1:
+            return _search_zip_members_in_pool(zip_path, [info.filename for info in candidates],
+                                               needle, max_workers, log_level)
+        return next((info.filename for info in candidates
+                     if _zip_member_matches(zip_ref, info, needle, zip_path, log_level)), None)
+
+
+def _read_zip_member(zip_path: str, member_name: str) -> pydicom.dataset.FileDataset:
+    """
+    Read the header of one zip member (pixel data excluded). The member is copied into memory first,
+    so the dataset keeps no reference to the (closed) archive.
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        data = zip_ref.read(member_name)
+    return pydicom.dcmread(io.BytesIO(data), force=False, stop_before_pixels=True)
+
+
+def _find_dicom_in_zip(zip_path: str, search_string: str, verbose: bool = False) -> Optional[str]:
+    """
+    Module-level (picklable) worker used by the process pool to search a single zip.
+    Returns the name of the matching member (a plain string the pool can send back), or None.
+    """
+    return _find_zip_member(zip_path, search_string.lower(), log_level=logging.INFO if verbose else logging.DEBUG)
@@ -1,16 +1,27 @@
 """
-Script to extract metadata from DICOM files in zipped folders and save it to a CSV file.
+Script to extract metadata from DICOM files in zipped folders and save it to a Parquet (or CSV) file.
 
 This script uses the `MetadataExtraction` class to find DICOM files based on their Series Description,
-extract metadata, and save the metadata to a CSV file.
+extract metadata, and save the metadata to a Parquet file (or a CSV file when `write_csv` is True).
 
 Author: Kostas Moschonas
 Updated: 27-11-2025
 """
 
-from extract_dicom_metadata import MetadataExtraction
-import pandas as pd
-import re
+import functools
+import logging
+import sys
+
+from extract_dicom_metadata import MetadataExtraction, write_metadata_csv
+
+# Whitespace and underscores removed (in one str.translate pass) before matching series descriptions
+_DEL_TBL = str.maketrans('', '', ' \t\n\r\x0b\x0c_')
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize(series_description):
+    """Lower-case and strip whitespace/underscores; cached, as the slices of a series share one description."""
+    return series_description.translate(_DEL_TBL).lower()
 
 # ## Series descriptions
 # stress_sequences = "stress"
@@ -22,19 +33,19 @@ def is_stress_sequence(series_description):
     """Check if the series description contains both stress and perf,
     to avoid picking other stress sequences like stress cine, etc."""
     # Normalize by converting to lower case and removing spaces and underscores
-    normalized_description = re.sub(r'[\s_]+', '', series_description.lower())
+    normalized_description = _normalize(series_description)
     return "stress" in normalized_description and "perf" in normalized_description
 
 def is_rest_sequence(series_description):
     """Check if the series description contains both rest and perf,
         to avoid picking other rest sequences inadvertedly labelled rest"""
     # Normalize by converting to lower case and removing spaces and underscores
-    normalized_description = re.sub(r'[\s_]+', '', series_description.lower())
+    normalized_description = _normalize(series_description)
     return "rest" in normalized_description and "perf" in normalized_description
 
 def is_perf_only_sequence(series_description):
     """Check if the series description contains perf, but not stress or rest."""
-    normalized_description = re.sub(r'[\s_]+', '', series_description.lower())
+    normalized_description = _normalize(series_description)
     return "perf" in normalized_description and "stress" not in normalized_description and "rest" not in normalized_description
 
 # USER DEFINED VARIABLES ----
@@ -42,55 +53,54 @@ def is_perf_only_sequence(series_description):
 # zip_folder_path = "input/zipped"
 folder_path = r"D:\cmrs\mavacamten_study\test"
 
-# Path and name of the output CSV file
+# Number of threads reading DICOM headers concurrently (about 8 for local SSDs, 64+ for network/USB drives)
+max_workers = 32
+
+# Path and name of the output file; written as Parquet (same name, `.parquet` suffix) unless `write_csv` is True.
+# Keep CSV only for downstream tools that require it; read Parquet back with `pd.read_parquet`.
 output_csv_path = "output/test.csv"
+write_csv = False
 
 # RUNNING CODE ----
+# Show the extractor's progress messages on stdout
+logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
 # Create an instance of MetadataExtraction
 metadata_extractor = MetadataExtraction()
 
-# Stress sequences
 # Find DICOM files
 # for zipped folder:
 # stress_dicom_files = metadata_extractor.find_dicom_in_zip_folder_by_series_description(zip_folder_path, stress_sequences)
-# for non zipped folder:
-stress_dicom_files = metadata_extractor.find_dicom_in_folder_by_series_description(
-    folder_path, filter_function=is_stress_sequence
-)
-
-# If no stress files found, search for "perf" only sequences
-if not stress_dicom_files:
-    stress_dicom_files = metadata_extractor.find_dicom_in_folder_by_series_description(
-        folder_path, filter_function=is_perf_only_sequence
-    )
-
-metadata_extractor.dicom_files = stress_dicom_files
-
-# Extract metadata
-stress_metadata_df = metadata_extractor.extract_metadata()
-
-# Rest sequences
-# Find DICOM files
-# for zipped folder:
 # rest_dicom_files = metadata_extractor.find_dicom_in_zip_folder_by_series_description(zip_folder_path, rest_sequences)
-# for non zipped folder:
-rest_dicom_files = metadata_extractor.find_dicom_in_folder_by_series_description(
-    folder_path, filter_function=is_rest_sequence
+# for non zipped folder (stress, rest and "perf" only sequences are binned in a single pass over the folder,
+# so every DICOM header is read once):
+found_dicom_files = metadata_extractor.find_dicom_in_folder_by_series_filters(
+    folder_path,
+    {"stress": is_stress_sequence, "rest": is_rest_sequence, "perf_only": is_perf_only_sequence},
+    max_workers=max_workers,
 )
+stress_dicom_files = found_dicom_files["stress"]
+rest_dicom_files = found_dicom_files["rest"]
 
+# If no stress or rest files found, fall back to "perf" only sequences
+if not stress_dicom_files:
+    stress_dicom_files = found_dicom_files["perf_only"]
 if not rest_dicom_files:
-    rest_dicom_files = metadata_extractor.find_dicom_in_folder_by_series_description(
-        folder_path, filter_function=is_perf_only_sequence
-    )
-
-metadata_extractor.dicom_files = rest_dicom_files
-
-# Extract metadata
-rest_metadata_df = metadata_extractor.extract_metadata()
-
-# Merge the two dataFrames
-merged_metadata_df = pd.concat([stress_metadata_df, rest_metadata_df], ignore_index=True)
-
-# Save the merged dataFrame to a CSV file
-merged_metadata_df.to_csv(output_csv_path, index=False)
+    rest_dicom_files = found_dicom_files["perf_only"]
+
+# Stress and rest sequences are extracted in one call (a list of pairs, since the perf only fallback
+# can put the same file in both), then each row is tagged with its phase
+metadata_extractor.dicom_files = list(stress_dicom_files.items()) + list(rest_dicom_files.items())
+
+# Extract metadata and tag the phase, then switch to Arrow-backed columns (so the Parquet/CSV conversion below
+# needs no per-cell copies); `convert_integer=False` keeps height/weight as doubles for whole-number batches
+merged_metadata_df = metadata_extractor.extract_metadata()
+merged_metadata_df["phase"] = ["stress"] * len(stress_dicom_files) + ["rest"] * len(rest_dicom_files)
+merged_metadata_df = merged_metadata_df.convert_dtypes(dtype_backend="pyarrow", convert_integer=False)
+
+# Save the merged dataFrame to a Parquet (or CSV) file
+if write_csv:
+    write_metadata_csv(merged_metadata_df, output_csv_path)
+else:
+    merged_metadata_df.to_parquet(output_csv_path.replace(".csv", ".parquet"), engine="pyarrow", compression="zstd")
 # print("CSV saved: output/merged_metadata_cmr.csv")
@@ -9,17 +9,45 @@ Date: 16-04-2025
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+# column of the keys file holding the original MRNs
+column_to_add = "mrn_original"
+# input format: the CSV file by default, or a Parquet file (e.g. main.py's output after renaming
+# `patient_ID` to `mrn`) when True
+read_parquet = False
+# output format: Parquet by default, CSV when True
+write_csv = False
 
 # Load data
-main_data = pd.read_csv("output/mavacamten_20250508.csv")
-# Load keys
-keys_df = pd.read_csv("keys/keys_mava.csv")
+if read_parquet:
+    main_data = pd.read_parquet("output/mavacamten_20250508.parquet", engine="pyarrow", dtype_backend="pyarrow")
+else:
+    # PyArrow CSV reader: `column_types` applies before type inference (unlike pandas' `dtype`),
+    # so study IDs are read as strings and keep any leading zeros
+    main_data = pacsv.read_csv("output/mavacamten_20250508.csv",
+                               convert_options=pacsv.ConvertOptions(column_types={"mrn": pa.string()})
+                               ).to_pandas(types_mapper=pd.ArrowDtype)
+# Load keys (only the columns needed for the lookup)
+keys_df = pacsv.read_csv("keys/keys_mava.csv",
+                         convert_options=pacsv.ConvertOptions(column_types={"study_id": pa.string()},
+                                                              include_columns=["study_id", column_to_add])
+                         ).to_pandas(types_mapper=pd.ArrowDtype)
 
 # rename the column containing the anonymised study IDs in main data to "study_id"
 main_data.rename(columns={"mrn": "study_id"}, inplace=True)
+# study IDs are strings on both sides of the lookup, so they match exactly whatever the input format
+main_data["study_id"] = main_data["study_id"].astype("string[pyarrow]")
 
-# merge dataframes on study_id
-merged_df = main_data.merge(keys_df, on="study_id", how="left")
+# look up the MRN of each study_id (left-join semantics: unknown study IDs are left missing)
+lookup = keys_df.set_index("study_id")[column_to_add]
+main_data[column_to_add] = main_data["study_id"].map(lookup)
+merged_df = main_data
 
-# save
-merged_df.to_csv("output/mavacamten_mrn_20250508.csv", index=False)
\ No newline at end of file
+# save as Parquet (set `write_csv` to True for downstream tools that require CSV)
+if write_csv:
+    pacsv.write_csv(pa.Table.from_pandas(merged_df, preserve_index=False), "output/mavacamten_mrn_20250508.csv",
+                    write_options=pacsv.WriteOptions(include_header=True))
+else:
+    merged_df.to_parquet("output/mavacamten_mrn_20250508.parquet", engine="pyarrow", compression="zstd")
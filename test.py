@@ -1,7 +1,43 @@
+import itertools
+import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
 import pydicom
 from pydicom.dataset import Dataset
 
+logger = logging.getLogger(__name__)
+
+# Random UID root generated once per process; new UIDs append the process ID and a counter to it
+_PREFIX = pydicom.uid.generate_uid()[:40].rstrip('.')
+_UID_COUNTER = itertools.count(1)
+
+# Tags to anonymize by blanking the value, resolved from their keywords once at import
+_ANON_TAGS = [pydicom.tag.Tag(keyword) for keyword in (
+    'PatientName',
+    'PatientID',
+    'PatientBirthDate',
+    'PatientSex',
+    'PatientAge',
+    'PatientAddress',
+    'PatientTelephoneNumbers',
+    'ReferringPhysicianName',
+    'InstitutionName',
+    'OperatorsName',
+    'StudyID',
+    'AccessionNumber',
+    'StudyInstanceUID',  # Replace with a new one if needed for consistency
+    'SeriesInstanceUID',  # Replace with a new one if needed for consistency
+    'SOPInstanceUID',  # Replace with a new one if needed for consistency
+)]
+
+
+def _fast_uid(counter=_UID_COUNTER):
+    """
+    Return a new unique UID (at most 64 characters) without hashing, unlike `generate_uid()`.
+    """
+    return f'{_PREFIX}.{os.getpid()}.{next(counter)}'
+
+
 def anonymize_dicom_file(input_path, output_path):
     """
     Loads a DICOM file, anonymizes it, and saves it to a new location.
@@ -10,54 +46,42 @@ def anonymize_dicom_file(input_path, output_path):
     :param output_path: Path to save the anonymized DICOM file.
     """
     try:
-        # Load the DICOM file
-        ds = pydicom.dcmread(input_path)
-
-        # List of tags to anonymize by blanking the value
-        tags_to_anonymize = [
-            'PatientName',
-            'PatientID',
-            'PatientBirthDate',
-            'PatientSex',
-            'PatientAge',
-            'PatientAddress',
-            'PatientTelephoneNumbers',
-            'ReferringPhysicianName',
-            'InstitutionName',
-            'OperatorsName',
-            'StudyID',
-            'AccessionNumber',
-            'StudyInstanceUID', # Replace with a new one if needed for consistency
-            'SeriesInstanceUID',# Replace with a new one if needed for consistency
-            'SOPInstanceUID' # Replace with a new one if needed for consistency
-        ]
-
-        for tag_name in tags_to_anonymize:
-            if tag_name in ds:
-                # Get the tag object from the name
-                tag = ds.data_element(tag_name)
-                if tag:
-                    # Blank the value
-                    tag.value = ''
+        # Load the DICOM file; values over 1 MB (pixel data) are deferred and only read back when saving
+        ds = pydicom.dcmread(input_path, defer_size='1 MB')
+
+        # Blank the value of each tag to anonymize (integer tag lookup, no keyword resolution)
+        for tag in _ANON_TAGS:
+            elem = ds.get(tag)
+            if elem is not None:
+                elem.value = ''
 
         # Remove private tags
         ds.remove_private_tags()
 
         # Generate new UIDs to break link to original study
-        ds.StudyInstanceUID = pydicom.uid.generate_uid()
-        ds.SeriesInstanceUID = pydicom.uid.generate_uid()
-        ds.SOPInstanceUID = pydicom.uid.generate_uid()
+        ds.StudyInstanceUID = _fast_uid()
+        ds.SeriesInstanceUID = _fast_uid()
+        ds.SOPInstanceUID = _fast_uid()
 
-        # Save the anonymized dataset
-        ds.save_as(output_path)
+        # Save the anonymized dataset through a 1 MB write buffer
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            ds.save_as(f)
 
     except Exception as e:
         print(f"Could not process file {input_path}: {e}")
 
 
+def _anon_one(paths):
+    """
+    Process-pool worker: anonymize one `(input_path, output_path)` pair.
+    """
+    input_path, output_path = paths
+    anonymize_dicom_file(input_path, output_path)
+
+
 def process_directory(input_dir, output_dir):
     """
-    Anonymizes all DICOM files in a directory.
+    Anonymizes all DICOM files in a directory, several files at a time in a process pool.
 
     :param input_dir: Directory containing original DICOM files.
     :param output_dir: Directory to save anonymized files.
@@ -66,34 +90,40 @@ def process_directory(input_dir, output_dir):
         os.makedirs(output_dir)
         print(f"Created output directory: {output_dir}")
 
-    for filename in os.listdir(input_dir):
-        input_path = os.path.join(input_dir, filename)
-        output_path = os.path.join(output_dir, filename)
+    # os.scandir gives the full path and the file type without extra stat calls
+    with os.scandir(input_dir) as entries:
+        tasks = [(entry.path, os.path.join(output_dir, entry.name))
+                 for entry in entries if entry.is_file(follow_symlinks=False)]
 
-        if os.path.isfile(input_path):
-            print(f"Anonymizing {input_path} -> {output_path}")
-            anonymize_dicom_file(input_path, output_path)
+    with ProcessPoolExecutor() as executor:
+        # Progress is logged from this process every 1000 files, so workers never contend for stdout
+        for i, _ in enumerate(executor.map(_anon_one, tasks, chunksize=16), start=1):
+            if i % 1000 == 0:
+                logger.info("Anonymized %d/%d files", i, len(tasks))
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
     # --- Configuration ---
     # Create dummy directories and a file for demonstration
     if not os.path.exists('dicom_input'):
         os.makedirs('dicom_input')
 
-    # Create a dummy DICOM file for testing
-    file_meta = pydicom.dataset.FileMetaDataset()
-    file_meta.MediaStorageSOPClassUID = '1.2.840.10008.5.1.4.1.1.2'
-    file_meta.MediaStorageSOPInstanceUID = "1.2.3"
-    file_meta.ImplementationClassUID = "1.2.3.4"
-
-    ds = Dataset()
-    ds.file_meta = file_meta
-    ds.PatientName = "Test^Patient"
-    ds.PatientID = "123456"
-    ds.PatientBirthDate = "20000101"
-    ds.is_little_endian = True
-    ds.is_implicit_VR = True
-    ds.save_as('dicom_input/test_dicom.dcm', write_like_original=False)
+    # Create a dummy DICOM file for testing (only once; later runs reuse it)
+    if not os.path.exists('dicom_input/test_dicom.dcm'):
+        file_meta = pydicom.dataset.FileMetaDataset()
+        file_meta.MediaStorageSOPClassUID = '1.2.840.10008.5.1.4.1.1.2'
+        file_meta.MediaStorageSOPInstanceUID = "1.2.3"
+        file_meta.ImplementationClassUID = "1.2.3.4"
+
+        ds = Dataset()
+        ds.file_meta = file_meta
+        ds.PatientName = "Test^Patient"
+        ds.PatientID = "123456"
+        ds.PatientBirthDate = "20000101"
+        ds.is_little_endian = True
+        ds.is_implicit_VR = True
+        ds.save_as('dicom_input/test_dicom.dcm', write_like_original=False)
     # --- End of dummy file creation ---
 
     input_directory = 'dicom_input'
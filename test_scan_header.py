@@ -0,0 +1,115 @@
+"""
+Tests for the hand-written header scanner (`_scan_header`) of extract_dicom_metadata.
+
+Each case writes a small DICOM file with pydicom and checks the scanner against
+`pydicom.dcmread(specific_tags=...)`. Run with: python -m unittest test_scan_header
+
+Author: Kostas Moschonas
+"""
+import os
+import tempfile
+import unittest
+import warnings
+
+import pydicom
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.filebase import DicomBytesIO
+from pydicom.filewriter import write_dataset, write_file_meta_info
+from pydicom.sequence import Sequence
+from pydicom.uid import ExplicitVRLittleEndian, ImplicitVRLittleEndian
+
+from extract_dicom_metadata import FINDER_TAGS, _read_finder_header, _scan_header, _tag_value
+
+
+def _make_dataset(series_description='Rest Perf', charset=None):
+    ds = Dataset()
+    if charset is not None:
+        ds.SpecificCharacterSet = charset
+    ds.StudyDate = '20240101'
+    ds.SeriesDescription = series_description
+    ds.PatientID = '001'
+    return ds
+
+
+def _make_file_meta(transfer_syntax):
+    file_meta = FileMetaDataset()
+    file_meta.MediaStorageSOPClassUID = '1.2.840.10008.5.1.4.1.1.4'
+    file_meta.MediaStorageSOPInstanceUID = '1.2.3.4'
+    file_meta.TransferSyntaxUID = transfer_syntax
+    return file_meta
+
+
+class ScanHeaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+
+    def _write(self, name, ds, transfer_syntax=ExplicitVRLittleEndian, implicit_vr=None):
+        """
+        Write `ds` with the DICM preamble and a meta header naming `transfer_syntax`.
+        The data set is encoded as implicit VR when `implicit_vr` is True (defaults to what the syntax says).
+        """
+        if implicit_vr is None:
+            implicit_vr = transfer_syntax == ImplicitVRLittleEndian
+        fp = DicomBytesIO()
+        fp.write(b'\x00' * 128 + b'DICM')
+        write_file_meta_info(fp, _make_file_meta(transfer_syntax))
+        fp.is_little_endian = True
+        fp.is_implicit_VR = implicit_vr
+        write_dataset(fp, ds)
+        path = os.path.join(self._tmpdir.name, name)
+        with open(path, 'wb') as f:
+            f.write(fp.getvalue())
+        return path
+
+    def _pydicom_header(self, path):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            ds = pydicom.dcmread(path, stop_before_pixels=True, specific_tags=FINDER_TAGS)
+        return {tag: str(_tag_value(ds, tag)) for tag in FINDER_TAGS if tag in ds}
+
+    def assertMatchesPydicom(self, path):
+        header = _scan_header(path, FINDER_TAGS)
+        self.assertIsNotNone(header)
+        self.assertEqual(header, self._pydicom_header(path))
+
+    def test_explicit_vr(self):
+        self.assertMatchesPydicom(self._write('explicit.dcm', _make_dataset()))
+
+    def test_implicit_vr_falls_back(self):
+        path = self._write('implicit.dcm', _make_dataset(), ImplicitVRLittleEndian)
+        self.assertIsNone(_scan_header(path, FINDER_TAGS))
+
+    def test_undefined_length_sequence(self):
+        ds = _make_dataset()
+        code = Dataset()
+        code.CodeValue = 'PERF'
+        code.CodeMeaning = 'Perfusion'
+        # ProcedureCodeSequence (0008,1032) sits between StudyDate and SeriesDescription
+        ds.ProcedureCodeSequence = Sequence([code])
+        ds['ProcedureCodeSequence'].is_undefined_length = True
+        code.is_undefined_length_sequence_item = True
+        self.assertMatchesPydicom(self._write('sequence.dcm', ds))
+
+    def test_supported_charset(self):
+        ds = _make_dataset(series_description='Perfusión repos', charset='ISO_IR 100')
+        self.assertMatchesPydicom(self._write('latin1.dcm', ds))
+
+    def test_unsupported_charset_falls_back(self):
+        ds = _make_dataset(charset='ISO_IR 144')
+        self.assertIsNone(_scan_header(self._write('cyrillic.dcm', ds), FINDER_TAGS))
+
+    def test_mislabeled_implicit_vr_falls_back(self):
+        # Meta header says explicit VR little endian, data set is implicit VR (pydicom detects and reads it)
+        path = self._write('mislabeled.dcm', _make_dataset(), ExplicitVRLittleEndian, implicit_vr=True)
+        self.assertIsNone(_scan_header(path, FINDER_TAGS))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            header, force = _read_finder_header(path)
+        self.assertEqual({tag: str(value) for tag, value in header.items()}, self._pydicom_header(path))
+        self.assertFalse(force)
+
+
+if __name__ == '__main__':
+    unittest.main()